@@ -4,6 +4,15 @@ import statsmodels.api as sm
 from statsmodels.tsa.stattools import adfuller
 from scipy import stats
 
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional; without it the backtest core runs as plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 
 def compute_hedge_ratio(y, x, method='ols'):
     """
@@ -26,11 +35,36 @@ def compute_hedge_ratio(y, x, method='ols'):
     
     df.columns = ['y', 'x']
     
-    X = sm.add_constant(df['x'])
-    
     if method == 'ols':
-        model = sm.OLS(df['y'], X).fit()
+        # Closed-form univariate least squares; avoids building a full
+        # statsmodels results object on every analytics tick
+        y_arr = df['y'].to_numpy(dtype=np.float64)
+        x_arr = df['x'].to_numpy(dtype=np.float64)
+        
+        x_mean = x_arr.mean()
+        y_mean = y_arr.mean()
+        dx = x_arr - x_mean
+        dy = y_arr - y_mean
+        
+        sxx = (dx * dx).sum()
+        if sxx == 0:
+            return None
+        
+        beta = (dx * dy).sum() / sxx
+        alpha = y_mean - beta * x_mean
+        resid = dy - beta * dx
+        
+        ss_res = (resid * resid).sum()
+        ss_tot = (dy * dy).sum()
+        
+        return {
+            'beta': beta,
+            'alpha': alpha,
+            'r_squared': 1 - ss_res / ss_tot if ss_tot > 0 else None,
+            'residuals': pd.Series(resid, index=df.index)
+        }
     elif method == 'huber':
+        X = sm.add_constant(df['x'])
         model = sm.RLM(df['y'], X, M=sm.robust.norms.HuberT()).fit()
     elif method == 'theilsen':
         slope, intercept, _, _, _ = stats.theilslopes(df['y'], df['x'])
@@ -56,24 +90,54 @@ def compute_spread(y, x, beta):
     return y - beta * x
 
 
+def _window_sums(values, window):
+    """Sums over each full trailing window, via one cumulative sum"""
+    cs = np.concatenate(([0.0], np.cumsum(values)))
+    return cs[window:] - cs[:-window]
+
+
 def compute_zscore(series, window):
     """Compute rolling z-score"""
     if len(series) < window:
         return pd.Series(index=series.index, dtype=float)
     
-    mean = series.rolling(window).mean()
-    std = series.rolling(window).std()
+    v = series.to_numpy(dtype=np.float64)
+    
+    # NaNs would poison every later window in the cumulative sums
+    if np.isnan(v).any():
+        mean = series.rolling(window).mean()
+        std = series.rolling(window).std().replace(0, np.nan)
+        return (series - mean) / std
+    
+    # Rolling mean/std in one pass from cumulative sums; centre first to
+    # limit cancellation in the sum of squares
+    c = v - v.mean()
+    sum_w = _window_sums(c, window)
+    sum2_w = _window_sums(c * c, window)
+    
+    mean = sum_w / window
+    # Sample variance (ddof=1) to match pandas rolling std
+    var = (sum2_w - sum_w * mean) / (window - 1) if window > 1 else np.full_like(mean, np.nan)
+    std = np.sqrt(np.maximum(var, 0))
     
     # Avoid division by zero
-    std = std.replace(0, np.nan)
+    std[std == 0] = np.nan
+    
+    z = np.full(len(v), np.nan)
+    z[window - 1:] = (c[window - 1:] - mean) / std
     
-    return (series - mean) / std
+    return pd.Series(z, index=series.index)
 
 
-def compute_adf_test(series, maxlag=None):
+def compute_adf_test(series, maxlag=None, autolag='AIC'):
     """
     Augmented Dickey-Fuller test for stationarity
     
+    Args:
+        series: Series to test (NaNs are dropped)
+        maxlag: Maximum lag; statsmodels default when None
+        autolag: Lag selection criterion, or None to use maxlag directly
+    
     Returns:
         dict with test results
     """
@@ -81,7 +145,7 @@ def compute_adf_test(series, maxlag=None):
         return None
     
     try:
-        result = adfuller(series.dropna(), maxlag=maxlag, autolag='AIC')
+        result = adfuller(series.dropna(), maxlag=maxlag, autolag=autolag)
         
         return {
             'adf_statistic': result[0],
@@ -100,7 +164,31 @@ def compute_rolling_correlation(y, x, window):
     if len(y) < window or len(x) < window:
         return pd.Series(index=y.index, dtype=float)
     
-    return y.rolling(window).corr(x)
+    y_arr = y.to_numpy(dtype=np.float64)
+    x_arr = x.to_numpy(dtype=np.float64)
+    
+    # Cumulative sums need aligned, NaN-free inputs
+    if (not y.index.equals(x.index) or np.isnan(y_arr).any()
+            or np.isnan(x_arr).any()):
+        return y.rolling(window).corr(x)
+    
+    # Rolling covariance/variances from five cumulative sums of the centred series
+    yc = y_arr - y_arr.mean()
+    xc = x_arr - x_arr.mean()
+    sum_y = _window_sums(yc, window)
+    sum_x = _window_sums(xc, window)
+    
+    cov = _window_sums(yc * xc, window) - sum_y * sum_x / window
+    var_y = _window_sums(yc * yc, window) - sum_y * sum_y / window
+    var_x = _window_sums(xc * xc, window) - sum_x * sum_x / window
+    
+    denom = np.sqrt(np.maximum(var_y, 0) * np.maximum(var_x, 0))
+    denom[denom == 0] = np.nan
+    
+    corr = np.full(len(y_arr), np.nan)
+    corr[window - 1:] = cov / denom
+    
+    return pd.Series(corr, index=y.index)
 
 
 def compute_volatility(prices, window=20):
@@ -114,6 +202,16 @@ def compute_volatility(prices, window=20):
     return volatility
 
 
+def compute_latest_volatility(prices, window=20):
+    """Annualized volatility over the last window returns only"""
+    p = np.asarray(prices, dtype=np.float64)[-(window + 1):]
+    if len(p) < window + 1 or window < 2:
+        return np.nan
+    
+    returns = np.diff(p) / p[:-1]
+    return returns.std(ddof=1) * np.sqrt(252 * 24 * 60)
+
+
 def compute_returns_stats(prices):
     """Compute basic return statistics"""
     returns = prices.pct_change().dropna()
@@ -132,6 +230,47 @@ def compute_returns_stats(prices):
     }
 
 
+@njit(cache=True)
+def _backtest_core(spread, zscore, entry_threshold, exit_threshold):
+    """
+    Mean reversion state machine over flat arrays
+    
+    Returns:
+        (entry_idx, exit_idx, position) arrays, one element per closed trade
+    """
+    n = len(zscore)
+    max_trades = n // 2 + 1
+    entry_idx = np.empty(max_trades, dtype=np.int64)
+    exit_idx = np.empty(max_trades, dtype=np.int64)
+    position_sign = np.empty(max_trades, dtype=np.int64)
+    
+    position = 0
+    entry = 0
+    n_trades = 0
+    
+    for i in range(n):
+        z = zscore[i]
+        
+        # Entry logic
+        if position == 0:
+            if z > entry_threshold:
+                position = -1
+                entry = i
+            elif z < -entry_threshold:
+                position = 1
+                entry = i
+        
+        # Exit logic
+        elif abs(z) < exit_threshold:
+            entry_idx[n_trades] = entry
+            exit_idx[n_trades] = i
+            position_sign[n_trades] = position
+            n_trades += 1
+            position = 0
+    
+    return entry_idx[:n_trades], exit_idx[:n_trades], position_sign[:n_trades]
+
+
 def simple_backtest(spread, zscore, entry_threshold=2.0, exit_threshold=0.5):
     """
     Simple mean reversion backtest
@@ -150,43 +289,14 @@ def simple_backtest(spread, zscore, entry_threshold=2.0, exit_threshold=0.5):
     if len(df) < 10:
         return None
     
-    position = 0
-    trades = []
-    entry_price = 0
-    entry_time = None
-    
-    for idx, row in df.iterrows():
-        z = row['zscore']
-        s = row['spread']
-        
-        # Entry logic
-        if position == 0:
-            if z > entry_threshold:
-                position = -1
-                entry_price = s
-                entry_time = idx
-            elif z < -entry_threshold:
-                position = 1
-                entry_price = s
-                entry_time = idx
-        
-        # Exit logic
-        elif position != 0 and abs(z) < exit_threshold:
-            pnl = position * (s - entry_price)
-            
-            trades.append({
-                'entry_time': entry_time,
-                'exit_time': idx,
-                'entry_price': entry_price,
-                'exit_price': s,
-                'position': 'SHORT' if position == -1 else 'LONG',
-                'pnl': pnl,
-                'return_pct': (pnl / abs(entry_price)) * 100
-            })
-            
-            position = 0
+    entry_idx, exit_idx, position = _backtest_core(
+        df['spread'].to_numpy(dtype=np.float64),
+        df['zscore'].to_numpy(dtype=np.float64),
+        float(entry_threshold),
+        float(exit_threshold)
+    )
     
-    if not trades:
+    if len(entry_idx) == 0:
         return {
             'total_trades': 0,
             'total_pnl': 0,
@@ -195,7 +305,20 @@ def simple_backtest(spread, zscore, entry_threshold=2.0, exit_threshold=0.5):
             'trades': []
         }
     
-    trades_df = pd.DataFrame(trades)
+    spread_arr = df['spread'].to_numpy()
+    entry_price = spread_arr[entry_idx]
+    exit_price = spread_arr[exit_idx]
+    pnl = position * (exit_price - entry_price)
+    
+    trades_df = pd.DataFrame({
+        'entry_time': df.index[entry_idx],
+        'exit_time': df.index[exit_idx],
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'position': np.where(position == -1, 'SHORT', 'LONG'),
+        'pnl': pnl,
+        'return_pct': (pnl / np.abs(entry_price)) * 100
+    })
     
     return {
         'total_trades': len(trades_df),
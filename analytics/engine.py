@@ -1,18 +1,31 @@
+import math
 import sqlite3
+import threading
 import time
 import os
+import signal
 import yaml
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 import logging
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    # Parquet archiving is optional; SQLite remains the primary store
+    pa = None
+
 from analytics.computations import (
     compute_hedge_ratio,
     compute_spread,
     compute_zscore,
     compute_adf_test,
     compute_rolling_correlation,
-    compute_volatility,
+    compute_latest_volatility,
     compute_returns_stats
 )
 
@@ -32,17 +45,110 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 DB_PATH = config['database']['path']
+PARQUET_PATH = config['database'].get('parquet_path')
+PARQUET_FLUSH_ROWS = config['database'].get('parquet_flush_rows', 500)
+PARQUET_FLUSH_SECONDS = config['database'].get('parquet_flush_seconds', 21600)
+PARQUET_PARTITIONS = ['pair_y', 'pair_x', 'timeframe', 'date']
+# Startup recovery only looks at the newest date partitions
+PARQUET_RECOVERY_DAYS = 2
+# Fixed archive schema mirroring the analytics table (plus the date
+# partition), so a flush where a column is all None still writes it as
+# double instead of a null type that later reads cannot merge
+PARQUET_SCHEMA = pa.schema([
+    ('ts', pa.string()),
+    ('timeframe', pa.string()),
+    ('pair_y', pa.string()),
+    ('pair_x', pa.string()),
+    ('hedge_ratio', pa.float64()),
+    ('alpha', pa.float64()),
+    ('r_squared', pa.float64()),
+    ('spread', pa.float64()),
+    ('zscore', pa.float64()),
+    ('correlation', pa.float64()),
+    ('y_volatility', pa.float64()),
+    ('x_volatility', pa.float64()),
+    ('adf_statistic', pa.float64()),
+    ('adf_pvalue', pa.float64()),
+    ('is_stationary', pa.int64()),
+    ('date', pa.string())
+]) if pa is not None else None
 SYMBOL_PAIRS = config['symbols']['pairs']
 TIMEFRAMES = config['analytics']['timeframes']
 ROLLING_WINDOWS = config['analytics']['rolling_windows']
 LOOKBACK_MINUTES = config['analytics']['lookback_minutes']
 UPDATE_INTERVAL = config['analytics']['update_interval']
 BATCH_SIZE = config['analytics']['batch_size']
+WRITE_CHUNK_SIZE = 10000
+ANALYTICS_WORKERS = max(1, min(len(SYMBOL_PAIRS), os.cpu_count() or 1))
+
+# Fixed symbol universe, so tick frames can hold symbols as integer codes
+SYMBOL_DTYPE = pd.CategoricalDtype(
+    sorted({symbol for pair in SYMBOL_PAIRS for symbol in pair})
+)
+
+# Stationarity drifts slowly, so the ADF test only reruns every N iterations
+# per pair/timeframe and the last result is reused in between
+ADF_EVERY = {
+    '1s': 30,
+    '1min': 5,
+    '5min': 1
+}
+_adf_cache = {}
+_adf_counter = {}
+
+# Last result per pair/timeframe with the bar data it was computed from
+_result_cache = {}
+
+# Parquet only receives closed bars: the newest record per pair/timeframe is
+# held back until a record for a later bar replaces it
+_parquet_pending = {}
+# Closed bars waiting to be written, per partition, and when each
+# partition's buffer received its first row
+_parquet_buffers = {}
+_parquet_buffered_at = {}
+
+# Per-symbol tick buffers covering the lookback window, plus the raw ts of
+# the newest tick loaded and the trade ids already seen at that ms, so each
+# iteration only reads rows from there on
+_tick_buffers = {}
+_last_ts = {}
+_last_ids = {}
+
+SQLITE_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+    PRAGMA cache_size=-65536;
+"""
+
+# Single statement text so every batch hits SQLite's prepared-statement cache
+ANALYTICS_INSERT_SQL = (
+    "INSERT OR REPLACE INTO analytics VALUES "
+    "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+ANALYTICS_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_analytics_tf_pair
+    ON analytics(timeframe, pair_y, pair_x, ts DESC)
+"""
+
+_local = threading.local()
+
+
+def get_db_connection():
+    """Return this thread's SQLite connection, opening and tuning it once"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, timeout=30.0)
+        conn.executescript(SQLITE_PRAGMAS)
+        _local.conn = conn
+    return conn
 
 
 def create_analytics_table():
     """Initialize analytics database schema"""
-    conn = sqlite3.connect(DB_PATH, timeout=30.0)
+    conn = get_db_connection()
     cur = conn.cursor()
 
     cur.execute("""
@@ -67,10 +173,7 @@ def create_analytics_table():
     """)
     
     # Create index for faster queries
-    cur.execute("""
-        CREATE INDEX IF NOT EXISTS idx_analytics_tf_pair 
-        ON analytics(timeframe, pair_y, pair_x, ts DESC)
-    """)
+    cur.execute(ANALYTICS_INDEX_SQL)
     
     # Table for backtest results
     cur.execute("""
@@ -90,76 +193,121 @@ def create_analytics_table():
     """)
 
     conn.commit()
-    conn.close()
     logger.info("Analytics database schema initialized")
 
 
-def load_recent_ticks(pair_y, pair_x, lookback_minutes):
-    """Load recent tick data for a symbol pair"""
-    conn = sqlite3.connect(DB_PATH, timeout=30.0)
+def load_symbol_ticks(symbol, lookback_minutes):
+    """
+    Return the lookback window of ticks for one symbol
+    
+    Ticks are kept in an in-memory buffer per symbol; each call only
+    fetches and parses rows from the last millisecond seen onwards. That
+    millisecond is re-read because the ingester can commit fills sharing a
+    trade time in separate batches; trade ids already buffered are dropped.
+    """
+    conn = get_db_connection()
     
-    since = (datetime.utcnow() - timedelta(minutes=lookback_minutes)).isoformat()
+    # Tick ts is stored as epoch milliseconds
+    cutoff = pd.Timestamp.now(tz="UTC") - pd.Timedelta(minutes=lookback_minutes)
+    since = cutoff.value // 1_000_000
+    last_ts = _last_ts.get(symbol)
     
     query = """
-        SELECT ts, symbol, price, qty
+        SELECT ts, symbol, price, qty, trade_id
         FROM ticks
-        WHERE symbol IN (?, ?) AND ts >= ?
-        ORDER BY ts ASC
+        WHERE symbol = ? AND ts >= ?
+        ORDER BY ts ASC, trade_id ASC
     """
     
-    df = pd.read_sql(query, conn, params=(pair_y, pair_x, since))
-    conn.close()
+    start = since if last_ts is None or last_ts < since else last_ts
     
-    if df.empty:
-        return df
+    new = pd.read_sql(query, conn, params=(symbol, start))
+    buf = _tick_buffers.get(symbol)
+    
+    if start == last_ts:
+        seen = _last_ids.get(symbol, set())
+        new = new[~((new["ts"] == last_ts) & new["trade_id"].isin(seen))]
+    
+    if not new.empty:
+        newest = int(new["ts"].iloc[-1])
+        ids = set(new.loc[new["ts"] == newest, "trade_id"])
+        if newest == last_ts:
+            ids |= _last_ids.get(symbol, set())
+        _last_ts[symbol] = newest
+        _last_ids[symbol] = ids
+        
+        new = new.drop(columns="trade_id")
+        new["symbol"] = new["symbol"].astype(SYMBOL_DTYPE)
+        new["ts"] = pd.to_datetime(new["ts"], unit="ms", utc=True)
+        
+        buf = new if buf is None or buf.empty else pd.concat([buf, new], ignore_index=True)
+    
+    if buf is None:
+        return new.drop(columns="trade_id", errors="ignore")
+    
+    # Drop ticks that have aged out of the lookback window
+    if not buf.empty and buf["ts"].iloc[0] < cutoff:
+        buf = buf[buf["ts"] >= cutoff].reset_index(drop=True)
+    
+    _tick_buffers[symbol] = buf
+    return buf
+
+
+def load_recent_ticks(pair_y, pair_x, lookback_minutes):
+    """Load recent tick data for a symbol pair"""
+    frames = [
+        load_symbol_ticks(symbol, lookback_minutes)
+        for symbol in (pair_y, pair_x)
+    ]
+    frames = [df for df in frames if not df.empty]
+    
+    if not frames:
+        return pd.DataFrame(columns=["ts", "symbol", "price", "qty"])
+    
+    df = pd.concat(frames, ignore_index=True)
+    return df.sort_values("ts", kind="mergesort", ignore_index=True)
 
-    # Parse timestamps robustly: try mixed-format fast path, fallback to per-item parsing
-    try:
-        df["ts"] = pd.to_datetime(df["ts"], utc=True, format="mixed")
-    except Exception:
-        df["ts"] = pd.to_datetime(df["ts"].astype(str), utc=True, errors="coerce")
-    return df
 
 def resample_prices(df, timeframe="1s"):
     """
     Resample tick data to specified timeframe
-    Returns DataFrame with columns: ts, symbol, price, volume
+    Returns wide DataFrame indexed by ts with (price|volume, symbol) columns
     """
     if df.empty:
-        return pd.DataFrame(columns=["ts", "symbol", "price", "volume"])
-    
-    df = df.copy()
-    df = df.set_index("ts")
+        return pd.DataFrame()
+    
+    # One grouped resample: price is the last trade in the bar, volume the sum
+    bars = (
+        df.set_index("ts")
+        .groupby("symbol", observed=True)
+        .resample(timeframe)
+        .agg({"price": "last", "qty": "sum"})
+        .dropna()
+        .reset_index()
+        .rename(columns={"qty": "volume"})
+    )
     
-    # Resample for each symbol
-    resampled_list = []
+    # Pivot once so each symbol's bars are already aligned on ts
+    return bars.pivot(index="ts", columns="symbol", values=["price", "volume"])
+
+
+def cached_adf_test(pair_y, pair_x, timeframe, spread):
+    """Run ADF on the spread, reusing the cached result between reruns"""
+    key = (pair_y, pair_x, timeframe)
+    count = _adf_counter.get(key, 0)
+    _adf_counter[key] = count + 1
     
-    for symbol in df['symbol'].unique():
-        symbol_df = df[df['symbol'] == symbol]
-        
-        # Price: last value in period
-        price_bars = symbol_df['price'].resample(timeframe).last()
-        
-        # Volume: sum in period
-        volume_bars = symbol_df['qty'].resample(timeframe).sum()
-        
-        # Combine
-        bars = pd.DataFrame({
-            'ts': price_bars.index,
-            'symbol': symbol,
-            'price': price_bars.values,
-            'volume': volume_bars.values
-        })
-        
-        resampled_list.append(bars)
+    if key in _adf_cache and count % ADF_EVERY.get(timeframe, 1) != 0:
+        return _adf_cache[key]
     
-    if not resampled_list:
-        return pd.DataFrame(columns=["ts", "symbol", "price", "volume"])
+    # Fixed Schwert lag instead of an AIC sweep over every lag up to it
+    n = spread.count()
+    maxlag = int(round(12 * (n / 100) ** 0.25))
     
-    result = pd.concat(resampled_list, ignore_index=True)
-    result = result.dropna()
+    adf_result = compute_adf_test(spread, maxlag=maxlag, autolag=None)
+    _adf_cache[key] = adf_result
     
-    return result
+    return adf_result
 
 
 def process_pair_analytics(pair_y, pair_x, timeframe, df_ticks):
@@ -173,9 +321,10 @@ def process_pair_analytics(pair_y, pair_x, timeframe, df_ticks):
     if bars.empty:
         return None
     
-    # Split into Y and X series
-    y_bars = bars[bars["symbol"] == pair_y].set_index("ts").sort_index()
-    x_bars = bars[bars["symbol"] == pair_x].set_index("ts").sort_index()
+    prices = bars['price']
+    
+    if pair_y not in prices.columns or pair_x not in prices.columns:
+        return None
     
     # Require fewer bars for higher timeframes to allow quicker initial analytics
     min_bars_map = {
@@ -186,17 +335,28 @@ def process_pair_analytics(pair_y, pair_x, timeframe, df_ticks):
 
     required_bars = min_bars_map.get(timeframe, 30)
 
-    if len(y_bars) < required_bars or len(x_bars) < required_bars:
+    if (prices[pair_y].count() < required_bars or
+            prices[pair_x].count() < required_bars):
         return None
     
     # Align timestamps
-    y_price = y_bars['price']
-    x_price = x_bars['price']
-    y_volume = y_bars['volume']
-    x_volume = x_bars['volume']
+    aligned = prices[[pair_y, pair_x]].dropna()
+    aligned.columns = ['y', 'x']
+    
+    if aligned.empty:
+        return None
+    
+    # Bars only change at the edges: a new or updated last bar, or old bars
+    # leaving the lookback window. If neither happened, reuse the last result.
+    key = (pair_y, pair_x, timeframe)
+    last_y, last_x = aligned.to_numpy()[-1]
+    bars_key = (aligned.index[0], aligned.index[-1], len(aligned), last_y, last_x)
+    cached = _result_cache.get(key)
+    if cached is not None and cached[0] == bars_key:
+        return cached[1]
     
     # Compute hedge ratio
-    hedge_result = compute_hedge_ratio(y_price, x_price, method='ols')
+    hedge_result = compute_hedge_ratio(aligned['y'], aligned['x'], method='ols')
     
     if hedge_result is None:
         return None
@@ -205,10 +365,6 @@ def process_pair_analytics(pair_y, pair_x, timeframe, df_ticks):
     alpha = hedge_result['alpha']
     r_squared = hedge_result['r_squared']
     
-    # Align data for spread calculation
-    aligned = pd.concat([y_price, x_price], axis=1).dropna()
-    aligned.columns = ['y', 'x']
-    
     if len(aligned) < 30:
         return None
     
@@ -218,64 +374,80 @@ def process_pair_analytics(pair_y, pair_x, timeframe, df_ticks):
     # Compute rolling windows but cap them to available data length so we can
     # produce analytics with fewer bars during startup (may be approximate)
     z_window = min(ROLLING_WINDOWS.get('zscore', 30), max(3, len(aligned)))
-    aligned['zscore'] = compute_zscore(aligned['spread'], z_window)
 
     corr_window = min(ROLLING_WINDOWS.get('correlation', 60), max(3, len(aligned)))
-    aligned['correlation'] = compute_rolling_correlation(
+    corr_arr = compute_rolling_correlation(
         aligned['y'], aligned['x'], corr_window
-    )
+    ).to_numpy()
 
     vol_window = min(ROLLING_WINDOWS.get('volatility', 20), max(3, len(aligned)))
-    y_vol = compute_volatility(aligned['y'], vol_window)
-    x_vol = compute_volatility(aligned['x'], vol_window)
+    latest_y_vol = compute_latest_volatility(aligned['y'].to_numpy(), vol_window)
+    latest_x_vol = compute_latest_volatility(aligned['x'].to_numpy(), vol_window)
     
     # ADF test on spread
-    adf_result = compute_adf_test(aligned['spread'])
-    
-    # Get latest values
-    aligned = aligned.dropna()
-    
-    if aligned.empty:
-        return None
+    adf_result = cached_adf_test(pair_y, pair_x, timeframe, aligned['spread'])
+    
+    # Beta is refit on every call, which rewrites the whole spread history, so
+    # there is no running z-score state to carry over. Only the latest value
+    # is reported, and that needs just the last z_window spreads.
+    spread_arr = aligned['spread'].to_numpy()
+    zscore_v = compute_zscore(aligned['spread'].iloc[-z_window:], z_window).iloc[-1]
+    last = len(aligned) - 1
+    
+    if math.isnan(zscore_v) or math.isnan(corr_arr[last]):
+        # Latest row is incomplete: fall back to the last complete one
+        zscore_arr = compute_zscore(aligned['spread'], z_window).to_numpy()
+        complete = np.flatnonzero(~(np.isnan(zscore_arr) | np.isnan(corr_arr)))
+        
+        if len(complete) == 0:
+            return None
+        
+        last = complete[-1]
+        zscore_v = zscore_arr[last]
     
-    latest = aligned.iloc[-1]
-    latest_y_vol = y_vol.iloc[-1] if not y_vol.empty else None
-    latest_x_vol = x_vol.iloc[-1] if not x_vol.empty else None
+    spread_v = spread_arr[last]
+    corr_v = corr_arr[last]
     
     result = {
-        'ts': latest.name.isoformat(),
+        'ts': aligned.index[last].isoformat(),
         'timeframe': timeframe,
         'pair_y': pair_y,
         'pair_x': pair_x,
         'hedge_ratio': float(beta),
         'alpha': float(alpha),
         'r_squared': float(r_squared) if r_squared else None,
-        'spread': float(latest['spread']),
-        'zscore': float(latest['zscore']),
-        'correlation': float(latest['correlation']) if pd.notna(latest['correlation']) else None,
-        'y_volatility': float(latest_y_vol) if pd.notna(latest_y_vol) else None,
-        'x_volatility': float(latest_x_vol) if pd.notna(latest_x_vol) else None,
+        'spread': float(spread_v),
+        'zscore': float(zscore_v),
+        'correlation': float(corr_v),
+        'y_volatility': None if math.isnan(latest_y_vol) else float(latest_y_vol),
+        'x_volatility': None if math.isnan(latest_x_vol) else float(latest_x_vol),
         'adf_statistic': float(adf_result['adf_statistic']) if adf_result else None,
         'adf_pvalue': float(adf_result['p_value']) if adf_result else None,
         'is_stationary': int(adf_result['is_stationary']) if adf_result else None
     }
     
+    _result_cache[key] = (bars_key, result)
+    
     return result
 
 
-def batch_write_analytics(analytics_list):
-    """Write multiple analytics records to database in one transaction"""
-    if not analytics_list:
-        return
-    
-    conn = sqlite3.connect(DB_PATH, timeout=30.0)
-    cur = conn.cursor()
+def process_pair_timeframes(pair_y, pair_x, df_ticks):
+    """
+    Run process_pair_analytics for every timeframe of one pair
     
-    for analytics in analytics_list:
-        cur.execute("""
-            INSERT OR REPLACE INTO analytics VALUES 
-            (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    Submitted as a single worker task so the pair's tick frame is pickled
+    to the worker once per iteration rather than once per timeframe.
+    """
+    return [
+        (timeframe, process_pair_analytics(pair_y, pair_x, timeframe, df_ticks))
+        for timeframe in TIMEFRAMES
+    ]
+
+
+def analytics_rows(analytics_list):
+    """Convert analytics dicts to parameter tuples in analytics column order"""
+    return [
+        (
             analytics['ts'],
             analytics['timeframe'],
             analytics['pair_y'],
@@ -291,41 +463,229 @@ def batch_write_analytics(analytics_list):
             analytics['adf_statistic'],
             analytics['adf_pvalue'],
             analytics['is_stationary']
-        ))
+        )
+        for analytics in analytics_list
+    ]
+
+
+def batch_write_analytics(analytics_list):
+    """Write multiple analytics records to database in one transaction"""
+    if not analytics_list:
+        return
     
-    conn.commit()
-    conn.close()
+    rows = analytics_rows(analytics_list)
+    conn = get_db_connection()
+    
+    # Single transaction; chunk very large batches to bound statement size
+    with conn:
+        for start in range(0, len(rows), WRITE_CHUNK_SIZE):
+            conn.executemany(
+                ANALYTICS_INSERT_SQL, rows[start:start + WRITE_CHUNK_SIZE]
+            )
     
     logger.info(f"Wrote {len(analytics_list)} analytics records")
 
 
+def bulk_load_analytics(analytics_list):
+    """
+    Load a one-shot backfill of analytics records
+    
+    The analytics index is dropped for the load and rebuilt once at the end,
+    which is much cheaper than updating it row by row. Not meant to run
+    while the engine is streaming, since readers lose the index meanwhile.
+    """
+    if not analytics_list:
+        return
+    
+    conn = get_db_connection()
+    conn.execute("DROP INDEX IF EXISTS idx_analytics_tf_pair")
+    
+    try:
+        with conn:
+            conn.executemany(ANALYTICS_INSERT_SQL, analytics_rows(analytics_list))
+    finally:
+        conn.execute(ANALYTICS_INDEX_SQL)
+        conn.commit()
+    
+    logger.info(f"Bulk loaded {len(analytics_list)} analytics records")
+
+
+def _ignore_stop_signals():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+
+def _interrupt(signum, frame):
+    # One interrupt is enough; a repeat (run_all's SIGTERM after a Ctrl+C
+    # to the process group) must not break into the shutdown it started
+    _ignore_stop_signals()
+    raise KeyboardInterrupt
+
+
+def _init_worker():
+    """
+    Worker initializer: forked workers must not inherit _interrupt
+    
+    Ctrl+C reaches the whole process group; workers leave it to the parent,
+    which stops them through shutdown_worker_pools.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+def create_worker_pools():
+    """
+    Create one single-process pool per worker slot
+    
+    A pair is always routed to the same slot, so the per-process caches in
+    process_pair_analytics stay warm across iterations.
+    """
+    return [
+        ProcessPoolExecutor(max_workers=1, initializer=_init_worker)
+        for _ in range(ANALYTICS_WORKERS)
+    ]
+
+
+def shutdown_worker_pools(pools):
+    """Stop all worker processes"""
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def write_parquet_partition(partition, rows):
+    """Write one partition's buffered rows as a single Parquet file"""
+    table = pa.Table.from_pylist(rows, schema=PARQUET_SCHEMA)
+    pq.write_to_dataset(table, PARQUET_PATH, partition_cols=PARQUET_PARTITIONS)
+    
+    logger.info(f"Archived {len(rows)} analytics records to Parquet {'/'.join(partition)}")
+
+
+def archive_parquet_analytics(analytics_list, flush=False):
+    """
+    Append closed-bar analytics to the partitioned Parquet dataset
+    
+    Closed bars are buffered per pair/timeframe/date partition. A partition
+    is written once it holds PARQUET_FLUSH_ROWS bars, once its oldest
+    buffered bar is PARQUET_FLUSH_SECONDS old, once its date has ended, or
+    when flush is set, so slow timeframes still end up in few, larger files.
+    """
+    if not PARQUET_PATH or pa is None:
+        return
+    
+    now = time.monotonic()
+    for analytics in analytics_list:
+        key = (analytics['pair_y'], analytics['pair_x'], analytics['timeframe'])
+        pending = _parquet_pending.get(key)
+        if pending is not None and pending['ts'] != analytics['ts']:
+            # ts is ISO text in UTC, so its first 10 characters are the date
+            date = pending['ts'][:10]
+            partition = key + (date,)
+            _parquet_buffers.setdefault(partition, []).append(dict(pending, date=date))
+            _parquet_buffered_at.setdefault(partition, now)
+        _parquet_pending[key] = analytics
+    
+    for partition in list(_parquet_buffers):
+        rows = _parquet_buffers[partition]
+        if (
+            flush
+            or len(rows) >= PARQUET_FLUSH_ROWS
+            or now - _parquet_buffered_at[partition] >= PARQUET_FLUSH_SECONDS
+            or partition[3] < _parquet_pending[partition[:3]]['ts'][:10]
+        ):
+            write_parquet_partition(partition, rows)
+            del _parquet_buffers[partition]
+            del _parquet_buffered_at[partition]
+
+
+def recover_parquet_archive():
+    """
+    Re-queue analytics that reached SQLite but never made it to Parquet
+    
+    The archive buffers and the held-back newest bars only live in memory,
+    so a hard stop leaves a gap after the newest archived bar of each
+    pair/timeframe. On startup, SQLite rows past that watermark are fed back
+    through archive_parquet_analytics. Only the last PARQUET_RECOVERY_DAYS
+    date partitions are read, so startup cost does not grow with the archive.
+    """
+    if not PARQUET_PATH or pa is None:
+        return
+    
+    # Newest first; without archived bars in the window, recover from its start
+    dates = [
+        time.strftime('%Y-%m-%d', time.gmtime(time.time() - 86400 * days))
+        for days in range(PARQUET_RECOVERY_DAYS)
+    ]
+    
+    cur = get_db_connection().cursor()
+    records = []
+    for pair_y, pair_x in SYMBOL_PAIRS:
+        for timeframe in TIMEFRAMES:
+            watermark = dates[-1]
+            for date in dates:
+                path = os.path.join(
+                    PARQUET_PATH, f"pair_y={pair_y}", f"pair_x={pair_x}",
+                    f"timeframe={timeframe}", f"date={date}"
+                )
+                if os.path.isdir(path):
+                    newest = pc.max(pq.read_table(path, columns=['ts'])['ts']).as_py()
+                    if newest is not None:
+                        watermark = newest
+                        break
+            
+            cur.execute("""
+                SELECT * FROM analytics
+                WHERE timeframe = ? AND pair_y = ? AND pair_x = ? AND ts > ?
+                ORDER BY ts ASC
+            """, (timeframe, pair_y, pair_x, watermark))
+            columns = [col[0] for col in cur.description]
+            records.extend(dict(zip(columns, row)) for row in cur.fetchall())
+    
+    if records:
+        logger.info(f"Re-queued {len(records)} analytics records missing from Parquet")
+        archive_parquet_analytics(records)
+
+
 def analytics_loop():
     """Main analytics processing loop"""
+    # Ctrl+C and SIGTERM (run_all, process managers) both end the loop so
+    # the workers are shut down and the Parquet buffer is flushed
+    signal.signal(signal.SIGINT, _interrupt)
+    signal.signal(signal.SIGTERM, _interrupt)
+    
     create_analytics_table()
-    logger.info("Analytics engine started")
+    recover_parquet_archive()
+    pools = create_worker_pools()
+    logger.info(f"Analytics engine started with {len(pools)} worker processes")
     
     iteration = 0
     
-    while True:
-        try:
-            iteration += 1
-            analytics_batch = []
-            
-            # Process each symbol pair
-            for pair_y, pair_x in SYMBOL_PAIRS:
-                # Load recent ticks
-                df_ticks = load_recent_ticks(pair_y, pair_x, LOOKBACK_MINUTES)
-                
-                if df_ticks.empty:
-                    logger.debug(f"No ticks for {pair_y}/{pair_x}")
-                    continue
+    try:
+        while True:
+            try:
+                iteration += 1
+                analytics_batch = []
+                futures = {}
                 
-                # Process each timeframe
-                for timeframe in TIMEFRAMES:
-                    analytics = process_pair_analytics(
-                        pair_y, pair_x, timeframe, df_ticks
-                    )
+                # Fan out each symbol pair to its worker, all timeframes in one task
+                for i, (pair_y, pair_x) in enumerate(SYMBOL_PAIRS):
+                    # Load recent ticks
+                    df_ticks = load_recent_ticks(pair_y, pair_x, LOOKBACK_MINUTES)
+                    
+                    if df_ticks.empty:
+                        logger.debug(f"No ticks for {pair_y}/{pair_x}")
+                        continue
                     
+                    pool = pools[i % len(pools)]
+                    future = pool.submit(process_pair_timeframes, pair_y, pair_x, df_ticks)
+                    futures[future] = (pair_y, pair_x)
+                
+                results = (
+                    (futures[future], timeframe, analytics)
+                    for future in as_completed(futures)
+                    for timeframe, analytics in future.result()
+                )
+                
+                for (pair_y, pair_x), timeframe, analytics in results:
                     if analytics:
                         analytics_batch.append(analytics)
                         
@@ -343,24 +703,37 @@ def analytics_loop():
                             f"z={analytics['zscore']:.2f} | "
                             f"corr={corr_str}"
                         )
+                
+                # Batch write to database
+                if analytics_batch:
+                    batch_write_analytics(analytics_batch)
+                    archive_parquet_analytics(analytics_batch)
+                
+                # Log status every 10 iterations
+                if iteration % 10 == 0:
+                    logger.info(f"Completed iteration #{iteration}, processed {len(analytics_batch)} analytics")
+                
+                time.sleep(UPDATE_INTERVAL)
             
-            # Batch write to database
-            if analytics_batch:
-                batch_write_analytics(analytics_batch)
+            except KeyboardInterrupt:
+                logger.info("Analytics engine stopped by user")
+                break
             
-            # Log status every 10 iterations
-            if iteration % 10 == 0:
-                logger.info(f"Completed iteration #{iteration}, processed {len(analytics_batch)} analytics")
+            except BrokenProcessPool as e:
+                logger.error(f"Analytics worker died: {e}; restarting workers")
+                shutdown_worker_pools(pools)
+                pools = create_worker_pools()
+                time.sleep(2)
             
-            time.sleep(UPDATE_INTERVAL)
-        
-        except KeyboardInterrupt:
-            logger.info("Analytics engine stopped by user")
-            break
+            except Exception as e:
+                logger.error(f"Analytics error: {e}", exc_info=True)
+                time.sleep(2)
         
-        except Exception as e:
-            logger.error(f"Analytics error: {e}", exc_info=True)
-            time.sleep(2)
+    finally:
+        # Cleanup runs whatever ended the loop, shielded from further signals
+        _ignore_stop_signals()
+        shutdown_worker_pools(pools)
+        archive_parquet_analytics([], flush=True)
 
 
 if __name__ == "__main__":
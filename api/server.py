@@ -1,7 +1,11 @@
 from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+import csv
+import math
 import sqlite3
+import statistics
+import threading
 import pandas as pd
 import yaml
 import uvicorn
@@ -24,7 +28,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Gemscap Statistical Arbitrage API",
     description="REST API for cryptocurrency pairs trading analytics",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -38,12 +43,46 @@ app.add_middleware(
 
 DB_PATH = config['database']['path']
 SYMBOL_PAIRS = config['symbols']['pairs']
+# YAML yields pairs as lists; hashable tuples make membership O(1)
+SYMBOL_PAIRS_SET = frozenset((y, x) for y, x in SYMBOL_PAIRS)
+SYMBOLS = sorted({symbol for pair in SYMBOL_PAIRS for symbol in pair})
 TIMEFRAMES = config['analytics']['timeframes']
 
 
+SQLITE_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+    PRAGMA cache_size=-65536;
+"""
+
+_local = threading.local()
+
+
 def get_db_connection():
-    """Create database connection"""
-    return sqlite3.connect(DB_PATH, timeout=30.0)  # ← ADD timeout=30.0
+    """Return this worker thread's database connection, opening it once"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, timeout=30.0)
+        conn.executescript(SQLITE_PRAGMAS)
+        _local.conn = conn
+    return conn
+
+
+def fetch_records(query, params=()):
+    """Run a query and return rows as plain dicts, without going through pandas"""
+    cur = get_db_connection().cursor()
+    cur.row_factory = sqlite3.Row
+    return [dict(row) for row in cur.execute(query, params)]
+
+
+def mean_std(values):
+    """Mean and sample std of the non-null values (NaN when undefined)"""
+    values = [v for v in values if v is not None]
+    mean = statistics.fmean(values) if values else math.nan
+    std = statistics.stdev(values) if len(values) > 1 else math.nan
+    return mean, std
 
 
 @app.get("/")
@@ -75,14 +114,22 @@ def health_check():
         tables = [row[0] for row in cur.fetchall()]
         
         # Check recent data
-        cur.execute("SELECT COUNT(*) FROM ticks WHERE ts > datetime('now', '-5 minutes')")
+        # Tick ts is stored as epoch milliseconds; naming the symbols lets
+        # SQLite seek the (symbol, ts, trade_id) primary key for each one
+        cur.execute(
+            f"""
+            SELECT COUNT(*) FROM ticks
+            WHERE symbol IN ({", ".join("?" * len(SYMBOLS))})
+              AND ts > (strftime('%s', 'now') - 300) * 1000
+            """,
+            SYMBOLS
+        )
         recent_ticks = cur.fetchone()[0]
         
-        cur.execute("SELECT COUNT(*) FROM analytics WHERE ts > datetime('now', '-5 minutes')")
+        # Analytics ts is ISO text with a 'T' separator, so the cutoff must be too
+        cur.execute("SELECT COUNT(*) FROM analytics WHERE ts > strftime('%Y-%m-%dT%H:%M:%S', 'now', '-5 minutes')")
         recent_analytics = cur.fetchone()[0]
         
-        conn.close()
-        
         status = "healthy" if recent_ticks > 0 and recent_analytics > 0 else "degraded"
         
         return {
@@ -131,14 +178,12 @@ def get_analytics(
 ):
     """Get analytics data for a symbol pair"""
     
-    if (pair_y, pair_x) not in SYMBOL_PAIRS:
+    if (pair_y, pair_x) not in SYMBOL_PAIRS_SET:
         raise HTTPException(status_code=404, detail="Symbol pair not found")
     
     if timeframe not in TIMEFRAMES:
         raise HTTPException(status_code=400, detail=f"Invalid timeframe. Choose from: {TIMEFRAMES}")
     
-    conn = get_db_connection()
-    
     # Build query
     query = """
         SELECT *
@@ -158,10 +203,9 @@ def get_analytics(
     query += " ORDER BY ts DESC LIMIT ?"
     params.append(limit)
     
-    df = pd.read_sql(query, conn, params=params)
-    conn.close()
+    records = fetch_records(query, params)
     
-    if df.empty:
+    if not records:
         return {
             "pair_y": pair_y,
             "pair_x": pair_x,
@@ -170,9 +214,6 @@ def get_analytics(
             "count": 0
         }
     
-    # Convert to records
-    records = df.to_dict('records')
-    
     return {
         "pair_y": pair_y,
         "pair_x": pair_x,
@@ -187,34 +228,27 @@ def get_analytics(
 def get_latest(pair_y: str, pair_x: str):
     """Get latest analytics for all timeframes"""
     
-    if (pair_y, pair_x) not in SYMBOL_PAIRS:
+    if (pair_y, pair_x) not in SYMBOL_PAIRS_SET:
         raise HTTPException(status_code=404, detail="Symbol pair not found")
     
-    conn = get_db_connection()
-    
+    # One seek on idx_analytics_tf_pair per timeframe
     query = """
         SELECT *
         FROM analytics
-        WHERE pair_y = ? AND pair_x = ?
-        AND ts IN (
-            SELECT MAX(ts)
-            FROM analytics
-            WHERE pair_y = ? AND pair_x = ?
-            GROUP BY timeframe
-        )
+        WHERE timeframe = ? AND pair_y = ? AND pair_x = ?
+        ORDER BY ts DESC
+        LIMIT 1
     """
     
-    df = pd.read_sql(query, conn, params=(pair_y, pair_x, pair_y, pair_x))
-    conn.close()
+    result = {}
+    for timeframe in TIMEFRAMES:
+        records = fetch_records(query, (timeframe, pair_y, pair_x))
+        if records:
+            result[timeframe] = records[0]
     
-    if df.empty:
+    if not result:
         raise HTTPException(status_code=404, detail="No data found")
     
-    # Group by timeframe
-    result = {}
-    for _, row in df.iterrows():
-        result[row['timeframe']] = row.to_dict()
-    
     return {
         "pair_y": pair_y,
         "pair_x": pair_x,
@@ -231,11 +265,9 @@ def get_spread(
 ):
     """Get spread and z-score data"""
     
-    if (pair_y, pair_x) not in SYMBOL_PAIRS:
+    if (pair_y, pair_x) not in SYMBOL_PAIRS_SET:
         raise HTTPException(status_code=404, detail="Symbol pair not found")
     
-    conn = get_db_connection()
-    
     query = """
         SELECT ts, spread, zscore, hedge_ratio
         FROM analytics
@@ -244,26 +276,29 @@ def get_spread(
         LIMIT ?
     """
     
-    df = pd.read_sql(query, conn, params=(pair_y, pair_x, timeframe, limit))
-    conn.close()
+    records = fetch_records(query, (pair_y, pair_x, timeframe, limit))
     
-    if df.empty:
+    if not records:
         return {"data": [], "count": 0}
     
-    df = df.sort_values('ts')
+    # Query returns newest first; present oldest first
+    records.reverse()
+    
+    spread_mean, spread_std = mean_std(r['spread'] for r in records)
+    zscore_mean, zscore_std = mean_std(r['zscore'] for r in records)
     
     return {
         "pair_y": pair_y,
         "pair_x": pair_x,
         "timeframe": timeframe,
-        "data": df.to_dict('records'),
-        "count": len(df),
+        "data": records,
+        "count": len(records),
         "stats": {
-            "spread_mean": float(df['spread'].mean()),
-            "spread_std": float(df['spread'].std()),
-            "zscore_mean": float(df['zscore'].mean()),
-            "zscore_std": float(df['zscore'].std()),
-            "latest_hedge_ratio": float(df['hedge_ratio'].iloc[-1])
+            "spread_mean": spread_mean,
+            "spread_std": spread_std,
+            "zscore_mean": zscore_mean,
+            "zscore_std": zscore_std,
+            "latest_hedge_ratio": float(records[-1]['hedge_ratio'])
         }
     }
 
@@ -272,29 +307,26 @@ def get_spread(
 def get_all_correlations():
     """Get latest correlation for all pairs"""
     
-    conn = get_db_connection()
-    
     query = """
         SELECT pair_y, pair_x, timeframe, ts, correlation, zscore, is_stationary
-        FROM analytics
-        WHERE timeframe = '1min'
-        AND ts IN (
-            SELECT MAX(ts)
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY pair_y, pair_x ORDER BY ts DESC
+            ) AS rn
             FROM analytics
             WHERE timeframe = '1min'
-            GROUP BY pair_y, pair_x
         )
+        WHERE rn = 1
     """
     
-    df = pd.read_sql(query, conn)
-    conn.close()
+    records = fetch_records(query)
     
-    if df.empty:
+    if not records:
         return {"pairs": [], "count": 0}
     
     return {
-        "pairs": df.to_dict('records'),
-        "count": len(df),
+        "pairs": records,
+        "count": len(records),
         "timestamp": datetime.utcnow().isoformat()
     }
 
@@ -308,11 +340,9 @@ def export_data(
 ):
     """Export analytics data"""
     
-    if (pair_y, pair_x) not in SYMBOL_PAIRS:
+    if (pair_y, pair_x) not in SYMBOL_PAIRS_SET:
         raise HTTPException(status_code=404, detail="Symbol pair not found")
     
-    conn = get_db_connection()
-    
     query = """
         SELECT *
         FROM analytics
@@ -320,15 +350,17 @@ def export_data(
         ORDER BY ts ASC
     """
     
-    df = pd.read_sql(query, conn, params=(pair_y, pair_x, timeframe))
-    conn.close()
+    records = fetch_records(query, (pair_y, pair_x, timeframe))
     
-    if df.empty:
+    if not records:
         raise HTTPException(status_code=404, detail="No data found")
     
     if format == "csv":
         filename = f"analytics_{pair_y}_{pair_x}_{timeframe}.csv"
-        df.to_csv(filename, index=False)
+        with open(filename, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(records[0]))
+            writer.writeheader()
+            writer.writerows(records)
         return FileResponse(filename, media_type="text/csv", filename=filename)
     
     elif format == "json":
@@ -336,8 +368,8 @@ def export_data(
             "pair_y": pair_y,
             "pair_x": pair_x,
             "timeframe": timeframe,
-            "data": df.to_dict('records'),
-            "count": len(df)
+            "data": records,
+            "count": len(records)
         }
     
     else:
@@ -348,22 +380,18 @@ def export_data(
 def get_statistics(pair_y: str, pair_x: str):
     """Get statistical summary for a pair"""
     
-    if (pair_y, pair_x) not in SYMBOL_PAIRS:
+    if (pair_y, pair_x) not in SYMBOL_PAIRS_SET:
         raise HTTPException(status_code=404, detail="Symbol pair not found")
     
-    conn = get_db_connection()
-    
-    # Get data for last 24 hours
+    # Get data for last 24 hours (only the columns aggregated below)
     since = (datetime.utcnow() - timedelta(hours=24)).isoformat()
-    
     query = """
-        SELECT *
+        SELECT ts, spread, zscore, hedge_ratio, correlation
         FROM analytics
-        WHERE pair_y = ? AND pair_x = ? AND timeframe = '1min' AND ts >= ?
+        WHERE timeframe = '1min' AND pair_y = ? AND pair_x = ? AND ts >= ?
+        ORDER BY ts ASC
     """
-    
-    df = pd.read_sql(query, conn, params=(pair_y, pair_x, since))
-    conn.close()
+    df = pd.read_sql(query, get_db_connection(), params=(pair_y, pair_x, since))
     
     if df.empty:
         raise HTTPException(status_code=404, detail="No data found")
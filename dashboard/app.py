@@ -1,17 +1,27 @@
 import streamlit as st
 import sqlite3
+import threading
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import yaml
 import os
 import sys
+import warnings
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from analytics.computations import simple_backtest
 
+try:
+    import pyarrow  # noqa: F401 - backs DataFrame.to_parquet
+    HAS_PARQUET = True
+except ImportError:
+    # Parquet export is optional; CSV is always available
+    HAS_PARQUET = False
+
 # Load configuration
 with open('config.yaml', 'r') as f:
     config = yaml.safe_load(f)
@@ -21,18 +31,11 @@ SYMBOL_PAIRS = config['symbols']['pairs']
 TIMEFRAMES = config['analytics']['timeframes']
 REFRESH_INTERVAL = config['dashboard']['refresh_interval']
 MAX_POINTS = config['dashboard']['max_display_points']
+CHART_POINTS = 2000  # points per Plotly trace after downsampling
+COMPARISON_TTL = 60  # seconds; the all-pairs view changes slowly
+PAIR_OPTIONS = [f"{y}/{x}" for y, x in SYMBOL_PAIRS]
 
-# =====================================================
-# PAGE CONFIG
-# =====================================================
-st.set_page_config(
-    page_title=config['dashboard']['title'],
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Custom CSS
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .metric-card {
         background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
@@ -44,7 +47,19 @@ st.markdown("""
         border-radius: 10px;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# =====================================================
+# PAGE CONFIG
+# =====================================================
+st.set_page_config(
+    page_title=config['dashboard']['title'],
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS; elements must be re-emitted on every run to stay on the page
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 st.title(" " + config['dashboard']['title'])
 st.caption("Real-time cryptocurrency pairs trading analytics powered by Binance WebSocket")
@@ -55,10 +70,9 @@ st.caption("Real-time cryptocurrency pairs trading analytics powered by Binance
 st.sidebar.header("Strategy Control Panel")
 
 # Symbol pair selection
-pair_options = [f"{y}/{x}" for y, x in SYMBOL_PAIRS]
 selected_pair_str = st.sidebar.selectbox(
     "Trading Pair Selector",
-    options=pair_options,
+    options=PAIR_OPTIONS,
     index=0
 )
 pair_y, pair_x = selected_pair_str.split('/')
@@ -91,84 +105,225 @@ st.sidebar.divider()
 
 # Download section
 st.sidebar.header("📥 Export Data")
+export_format = st.sidebar.radio(
+    "Format",
+    ["CSV", "Parquet"] if HAS_PARQUET else ["CSV"],
+    horizontal=True
+)
 
 # =====================================================
 # DATA LOADING FUNCTIONS
 # =====================================================
+# WAL itself is enabled by the writers (ingestion, analytics engine); a
+# read-only connection cannot switch journal mode
+SQLITE_PRAGMAS = """
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-64000;
+    PRAGMA mmap_size=268435456;
+    PRAGMA busy_timeout=5000;
+"""
+
+
+def _open_db(path, **kwargs):
+    """Open a SQLite connection tuned for concurrent reads against the ingester"""
+    conn = sqlite3.connect(path, timeout=30.0, **kwargs)
+    conn.executescript(SQLITE_PRAGMAS)
+    return conn
+
+
+@st.cache_resource
+def get_reader():
+    """
+    Read-only connection shared by every rerun and session
+    
+    Streamlit runs sessions on separate threads, so the connection is
+    returned with a lock that serialises its use.
+    """
+    # mode=ro can never write; cache=private keeps this reader off any
+    # shared page cache the writers might use
+    conn = _open_db(f"file:{DB_PATH}?mode=ro&cache=private", uri=True, check_same_thread=False)
+    return conn, threading.Lock()
+
+
+def read_sql(query, params=(), **kwargs):
+    """Run a query on the shared reader connection"""
+    conn, lock = get_reader()
+    with lock:
+        return pd.read_sql_query(query, conn, params=params, **kwargs)
+
+
 @st.cache_data(ttl=REFRESH_INTERVAL)
 def load_analytics(pair_y, pair_x, timeframe, limit=MAX_POINTS):
     """Load analytics data for a specific pair and timeframe"""
-    conn = sqlite3.connect(DB_PATH, timeout=30.0)
-    
+    # Pair and timeframe are fixed by the filter, so only value columns are read
     query = """
-        SELECT *
+        SELECT ts, hedge_ratio, alpha, r_squared, spread, zscore, correlation,
+               y_volatility, x_volatility, adf_statistic, adf_pvalue, is_stationary
         FROM analytics
         WHERE pair_y = ? AND pair_x = ? AND timeframe = ?
         ORDER BY ts DESC
         LIMIT ?
     """
     
-    df = pd.read_sql(query, conn, params=(pair_y, pair_x, timeframe, limit))
-    conn.close()
+    df = read_sql(
+        query,
+        params=(pair_y, pair_x, timeframe, limit),
+        parse_dates={"ts": {"utc": True, "format": "ISO8601"}}
+    )
     
-    if df.empty:
-        return df
-
-    # Parse timestamps robustly: try mixed-format fast path, fallback to per-item parsing
-    try:
-        df["ts"] = pd.to_datetime(df["ts"], utc=True, format="mixed")
-    except Exception:
-        df["ts"] = pd.to_datetime(df["ts"].astype(str), utc=True, errors="coerce")
-    return df.sort_values("ts")
+    # Newest rows were selected; flip once to chronological order
+    return df.iloc[::-1].reset_index(drop=True)
 
 
 @st.cache_data(ttl=REFRESH_INTERVAL)
 def load_price_data(pair_y, pair_x, limit=MAX_POINTS):
     """Load raw price tick data"""
-    conn = sqlite3.connect(DB_PATH, timeout=30.0)
-    
+    # Ticks are clustered by (symbol, ts): take each symbol's newest rows
+    # with a backward primary-key walk, then merge only those
     query = """
         SELECT ts, symbol, price, qty
-        FROM ticks
-        WHERE symbol IN (?, ?)
+        FROM (
+            SELECT * FROM (
+                SELECT ts, symbol, price, qty FROM ticks
+                WHERE symbol = ? ORDER BY ts DESC LIMIT ?
+            )
+            UNION ALL
+            SELECT * FROM (
+                SELECT ts, symbol, price, qty FROM ticks
+                WHERE symbol = ? ORDER BY ts DESC LIMIT ?
+            )
+        )
         ORDER BY ts DESC
         LIMIT ?
     """
     
-    df = pd.read_sql(query, conn, params=(pair_y, pair_x, limit))
-    conn.close()
+    df = read_sql(query, params=(pair_y, limit, pair_x, limit, limit))
     
     if df.empty:
         return df
 
-    # Parse timestamps robustly: try mixed-format fast path, fallback to per-item parsing
-    try:
-        df["ts"] = pd.to_datetime(df["ts"], utc=True, format="mixed")
-    except Exception:
-        df["ts"] = pd.to_datetime(df["ts"].astype(str), utc=True, errors="coerce")
+    # Tick ts is stored as epoch milliseconds
+    df["ts"] = pd.to_datetime(df["ts"], unit="ms", utc=True)
 
-    return df.sort_values("ts")
+    # Newest rows were selected; flip once to chronological order
+    return df.iloc[::-1].reset_index(drop=True)
 
 
-@st.cache_data(ttl=60)
+@st.cache_data(ttl=COMPARISON_TTL)
 def get_all_pairs_latest(timeframe='1min'):
     """Get latest analytics for all pairs for a given timeframe"""
-    conn = sqlite3.connect(DB_PATH, timeout=30.0)
-
+    # ROW_NUMBER picks each pair's newest row; a bare GROUP BY with MAX(ts)
+    # would take the other columns from an arbitrary row of the group
     query = """
-        SELECT pair_y, pair_x, timeframe, MAX(ts) as ts, 
+        SELECT pair_y, pair_x, pair_y || '/' || pair_x AS pair, timeframe, ts,
                hedge_ratio, spread, zscore, correlation, is_stationary
-        FROM analytics
-        WHERE timeframe = ?
-        GROUP BY pair_y, pair_x, timeframe
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY pair_y, pair_x ORDER BY ts DESC
+            ) AS rn
+            FROM analytics
+            WHERE timeframe = ?
+        )
+        WHERE rn = 1
     """
 
-    df = pd.read_sql(query, conn, params=(timeframe,))
-    conn.close()
+    df = read_sql(query, params=(timeframe,))
 
     return df
 
 
+@st.cache_data(max_entries=32)
+def run_backtest(spread_vals, zscore_vals, ts_vals, entry, exit):
+    """
+    Cached simple_backtest over raw array bytes
+    
+    Bytes hash far cheaper than Series, so refreshes with unchanged data
+    and thresholds are served from the cache.
+    """
+    index = pd.to_datetime(np.frombuffer(ts_vals, dtype="datetime64[ns]"), utc=True)
+    return simple_backtest(
+        pd.Series(np.frombuffer(spread_vals), index=index),
+        pd.Series(np.frombuffer(zscore_vals), index=index),
+        entry_threshold=entry,
+        exit_threshold=exit
+    )
+
+
+@st.cache_data(max_entries=32)
+def summary_stats(df, columns):
+    """count/mean/std/min/max per column, one NumPy pass each"""
+    arr = df[list(columns)].to_numpy(dtype=float)
+    
+    # All-NaN columns (e.g. correlation during warm-up) just yield NaN
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return pd.DataFrame({
+            "count": np.sum(~np.isnan(arr), axis=0),
+            "mean": np.nanmean(arr, axis=0),
+            "std": np.nanstd(arr, axis=0, ddof=1),
+            "min": np.nanmin(arr, axis=0),
+            "max": np.nanmax(arr, axis=0),
+        }, index=list(columns))
+
+
+# File extension and MIME type per export format
+EXPORT_TYPES = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+@st.cache_data
+def encode_export(df, fmt="CSV"):
+    """File bytes for a download button, re-encoded only when the data changes"""
+    if fmt == "Parquet":
+        return df.to_parquet(index=False)
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def lttb(x, y, n=CHART_POINTS):
+    """
+    Indices kept by largest-triangle-three-buckets downsampling
+    
+    The first and last points are always kept; in between, each bucket
+    keeps the point forming the largest triangle with the previously kept
+    point and the average of the next bucket.
+    """
+    size = len(y)
+    if n >= size or n < 3:
+        return np.arange(size)
+    
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, size - 1, n - 1).astype(int)
+    
+    keep = np.empty(n, dtype=np.int64)
+    keep[0], keep[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < n - 1 else size
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        # NaN gaps (e.g. correlation warm-up) lose to any real point
+        a = lo + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        keep[i + 1] = a
+    
+    return keep
+
+
+def downsample(df, column, n=CHART_POINTS):
+    """Rows of df that preserve the shape of df[column] over ts"""
+    if len(df) <= n:
+        return df
+    return df.iloc[lttb(df["ts"].astype("int64").to_numpy(), df[column].to_numpy(), n)]
+
+
 # =====================================================
 # LOAD DATA
 # =====================================================
@@ -179,82 +334,95 @@ if df_analytics.empty:
     st.info("Make sure the ingestion and analytics engines are running. Data will appear within 60 seconds.")
     st.stop()
 
-latest = df_analytics.iloc[-1]
+df_prices = load_price_data(pair_y, pair_x)
 
 # =====================================================
-# KEY METRICS ROW
+# LIVE VIEW
 # =====================================================
-col1, col2, col3, col4, col5 = st.columns(5)
+# Only the metrics row, alert banner and price charts refresh on a timer;
+# the rest of the page reruns when the user changes a control
+LIVE_RUN_EVERY = REFRESH_INTERVAL if auto_refresh else None
 
-with col1:
-    st.metric(
-        "Hedge Ratio (β)",
-        f"{latest['hedge_ratio']:.4f}",
-        help="OLS regression coefficient: Y = α + β·X"
-    )
-
-with col2:
-    spread_delta = df_analytics['spread'].diff().iloc[-1] if len(df_analytics) > 1 else 0
-    st.metric(
-        "Spread",
-        f"{latest['spread']:.2f}",
-        f"{spread_delta:+.2f}",
-        help="Y - β·X"
-    )
 
-with col3:
-    z_delta = df_analytics['zscore'].diff().iloc[-1] if len(df_analytics) > 1 else 0
-    st.metric(
-        "Z-Score",
-        f"{latest['zscore']:.2f}",
-        f"{z_delta:+.2f}",
-        delta_color="inverse",
-        help="(Spread - μ) / σ"
-    )
+@st.fragment(run_every=LIVE_RUN_EVERY)
+def render_live_metrics():
+    """Key metrics row and z-score alert banner"""
+    df_analytics = load_analytics(pair_y, pair_x, selected_timeframe)
+    if df_analytics.empty:
+        return
+    
+    latest = df_analytics.iloc[-1]
+    
+    col1, col2, col3, col4, col5 = st.columns(5)
 
-with col4:
-    if pd.notna(latest['correlation']):
+    with col1:
         st.metric(
-            "Correlation",
-            f"{latest['correlation']:.3f}",
-            help="Rolling correlation between Y and X"
+            "Hedge Ratio (β)",
+            f"{latest['hedge_ratio']:.4f}",
+            help="OLS regression coefficient: Y = α + β·X"
         )
-    else:
-        st.metric("Correlation", "N/A")
 
-with col5:
-    if pd.notna(latest['is_stationary']):
-        stationary_text = "✅ Yes" if latest['is_stationary'] == 1 else "❌ No"
+    with col2:
+        spread_delta = df_analytics['spread'].diff().iloc[-1] if len(df_analytics) > 1 else 0
         st.metric(
-            "Stationary",
-            stationary_text,
-            help=f"ADF p-value: {latest['adf_pvalue']:.4f}" if pd.notna(latest['adf_pvalue']) else "ADF test"
+            "Spread",
+            f"{latest['spread']:.2f}",
+            f"{spread_delta:+.2f}",
+            help="Y - β·X"
         )
-    else:
-        st.metric("Stationary", "Testing...")
 
-# =====================================================
-# ALERT BANNER
-# =====================================================
-if abs(latest["zscore"]) >= z_alert:
-    st.error(f"🚨 ALERT: |Z-score| = {abs(latest['zscore']):.2f} ≥ {z_alert} - Mean reversion opportunity detected!")
-else:
-    st.success(f"✅ Z-score within normal range (|z| < {z_alert})")
+    with col3:
+        z_delta = df_analytics['zscore'].diff().iloc[-1] if len(df_analytics) > 1 else 0
+        st.metric(
+            "Z-Score",
+            f"{latest['zscore']:.2f}",
+            f"{z_delta:+.2f}",
+            delta_color="inverse",
+            help="(Spread - μ) / σ"
+        )
 
-# =====================================================
-# MAIN CHARTS
-# =====================================================
-st.divider()
+    with col4:
+        if pd.notna(latest['correlation']):
+            st.metric(
+                "Correlation",
+                f"{latest['correlation']:.3f}",
+                help="Rolling correlation between Y and X"
+            )
+        else:
+            st.metric("Correlation", "N/A")
+
+    with col5:
+        if pd.notna(latest['is_stationary']):
+            stationary_text = "✅ Yes" if latest['is_stationary'] == 1 else "❌ No"
+            st.metric(
+                "Stationary",
+                stationary_text,
+                help=f"ADF p-value: {latest['adf_pvalue']:.4f}" if pd.notna(latest['adf_pvalue']) else "ADF test"
+            )
+        else:
+            st.metric("Stationary", "Testing...")
+    
+    # Alert banner
+    if abs(latest["zscore"]) >= z_alert:
+        st.error(f"🚨 ALERT: |Z-score| = {abs(latest['zscore']):.2f} ≥ {z_alert} - Mean reversion opportunity detected!")
+    else:
+        st.success(f"✅ Z-score within normal range (|z| < {z_alert})")
 
-# Create tabs for different views
-tab1, tab2, tab3, tab4 = st.tabs(["📈 Price & Spread", "📊 Analytics", "🎯 Backtest", "📋 Data"])
 
-with tab1:
+@st.fragment(run_every=LIVE_RUN_EVERY)
+def render_price_charts():
+    """Price, spread and volume charts for the selected pair"""
+    df_analytics = load_analytics(pair_y, pair_x, selected_timeframe)
+    
     st.subheader(f"Price Charts - {pair_y} vs {pair_x}")
     
-    # Load price data
+    # Timed fragment reruns skip the top of the script, so reload here
     df_prices = load_price_data(pair_y, pair_x)
     
+    # One pass to split the ticks by symbol, reused by the price and volume charts
+    by_symbol = {sym: g for sym, g in df_prices.groupby("symbol", sort=False)} if not df_prices.empty else {}
+    empty = df_prices.iloc[:0]
+    
     if not df_prices.empty:
         # Create subplots
         fig = make_subplots(
@@ -266,7 +434,7 @@ with tab1:
         )
         
         # Y prices
-        y_prices = df_prices[df_prices['symbol'] == pair_y]
+        y_prices = downsample(by_symbol.get(pair_y, empty), 'price')
         fig.add_trace(
             go.Scatter(
                 x=y_prices['ts'],
@@ -279,7 +447,7 @@ with tab1:
         )
         
         # X prices
-        x_prices = df_prices[df_prices['symbol'] == pair_x]
+        x_prices = downsample(by_symbol.get(pair_x, empty), 'price')
         fig.add_trace(
             go.Scatter(
                 x=x_prices['ts'],
@@ -293,10 +461,11 @@ with tab1:
         )
         
         # Spread
+        spread = downsample(df_analytics, 'spread')
         fig.add_trace(
             go.Scatter(
-                x=df_analytics['ts'],
-                y=df_analytics['spread'],
+                x=spread['ts'],
+                y=spread['spread'],
                 name='Spread',
                 line=dict(color='#4facfe', width=2),
                 fill='tozeroy',
@@ -330,7 +499,7 @@ with tab1:
         fig_vol = go.Figure()
         
         for symbol in [pair_y, pair_x]:
-            symbol_data = df_prices[df_prices['symbol'] == symbol]
+            symbol_data = by_symbol.get(symbol, empty)
             fig_vol.add_trace(go.Bar(
                 x=symbol_data['ts'],
                 y=symbol_data['qty'],
@@ -348,6 +517,23 @@ with tab1:
         
         st.plotly_chart(fig_vol, use_container_width=True)
 
+
+# =====================================================
+# KEY METRICS ROW
+# =====================================================
+render_live_metrics()
+
+# =====================================================
+# MAIN CHARTS
+# =====================================================
+st.divider()
+
+# Create tabs for different views
+tab1, tab2, tab3, tab4 = st.tabs(["📈 Price & Spread", "📊 Analytics", "🎯 Backtest", "📋 Data"])
+
+with tab1:
+    render_price_charts()
+
 with tab2:
     st.subheader("Statistical Analytics")
     
@@ -356,10 +542,11 @@ with tab2:
     with col_a:
         # Z-Score over time
         fig_z = go.Figure()
+        zscore = downsample(df_analytics, 'zscore')
         
         fig_z.add_trace(go.Scatter(
-            x=df_analytics['ts'],
-            y=df_analytics['zscore'],
+            x=zscore['ts'],
+            y=zscore['zscore'],
             name='Z-Score',
             line=dict(color='#00f2fe', width=2),
             fill='tozeroy'
@@ -383,10 +570,11 @@ with tab2:
     with col_b:
         # Correlation over time
         fig_corr = go.Figure()
+        corr = downsample(df_analytics, 'correlation')
         
         fig_corr.add_trace(go.Scatter(
-            x=df_analytics['ts'],
-            y=df_analytics['correlation'],
+            x=corr['ts'],
+            y=corr['correlation'],
             name='Correlation',
             line=dict(color='#ffd89b', width=2),
             fill='tozeroy'
@@ -406,17 +594,19 @@ with tab2:
     st.subheader("Volatility Analysis")
     
     fig_vol = go.Figure()
+    y_vol = downsample(df_analytics, 'y_volatility')
+    x_vol = downsample(df_analytics, 'x_volatility')
     
     fig_vol.add_trace(go.Scatter(
-        x=df_analytics['ts'],
-        y=df_analytics['y_volatility'],
+        x=y_vol['ts'],
+        y=y_vol['y_volatility'],
         name=f'{pair_y} Volatility',
         line=dict(color='#667eea', width=2)
     ))
     
     fig_vol.add_trace(go.Scatter(
-        x=df_analytics['ts'],
-        y=df_analytics['x_volatility'],
+        x=x_vol['ts'],
+        y=x_vol['x_volatility'],
         name=f'{pair_x} Volatility',
         line=dict(color='#f093fb', width=2)
     ))
@@ -434,10 +624,11 @@ with tab2:
     st.subheader("Hedge Ratio Evolution")
     
     fig_beta = go.Figure()
+    beta = downsample(df_analytics, 'hedge_ratio')
     
     fig_beta.add_trace(go.Scatter(
-        x=df_analytics['ts'],
-        y=df_analytics['hedge_ratio'],
+        x=beta['ts'],
+        y=beta['hedge_ratio'],
         name='Hedge Ratio (β)',
         line=dict(color='#4facfe', width=2),
         mode='lines+markers',
@@ -464,11 +655,12 @@ with tab3:
             exit_z = st.number_input("Exit Z-Score", value=0.5, min_value=0.0, max_value=2.0, step=0.1)
         
         # Run backtest
-        backtest_result = simple_backtest(
-            df_analytics['spread'],
-            df_analytics['zscore'],
-            entry_threshold=entry_z,
-            exit_threshold=exit_z
+        backtest_result = run_backtest(
+            df_analytics['spread'].to_numpy(dtype=float).tobytes(),
+            df_analytics['zscore'].to_numpy(dtype=float).tobytes(),
+            df_analytics['ts'].to_numpy(dtype="datetime64[ns]").tobytes(),
+            entry_z,
+            exit_z
         )
         
         if backtest_result and backtest_result['total_trades'] > 0:
@@ -492,8 +684,8 @@ with tab3:
             # Trades table
             st.write("#### Trade History")
             trades_df = backtest_result['trades']
-            trades_df['entry_time'] = pd.to_datetime(trades_df['entry_time'])
-            trades_df['exit_time'] = pd.to_datetime(trades_df['exit_time'])
+            trades_df['entry_time'] = pd.to_datetime(trades_df['entry_time'], utc=True, cache=True)
+            trades_df['exit_time'] = pd.to_datetime(trades_df['exit_time'], utc=True, cache=True)
             
             # Pandas Styler may require matplotlib for background_gradient.
             styled = trades_df.style.format({
@@ -564,12 +756,12 @@ with tab4:
         ascending=(sort_order == "Ascending")
     )
     
-    # Format numeric columns
+    # Format numeric columns in the browser rather than cell by cell in Python
     numeric_cols = display_df.select_dtypes(include=['float64', 'float32']).columns
-    format_dict = {col: '{:.4f}' for col in numeric_cols}
     
     st.dataframe(
-        display_df.style.format(format_dict),
+        display_df,
+        column_config={col: st.column_config.NumberColumn(format="%.4f") for col in numeric_cols},
         use_container_width=True,
         height=400
     )
@@ -577,8 +769,8 @@ with tab4:
     if show_stats_table:
         st.subheader("Summary Statistics")
         
-        stats = df_analytics[['spread', 'zscore', 'hedge_ratio', 'correlation']].describe()
-        st.dataframe(stats.T, use_container_width=True)
+        stats = summary_stats(df_analytics, ('spread', 'zscore', 'hedge_ratio', 'correlation'))
+        st.dataframe(stats, use_container_width=True)
 
 # =====================================================
 # MULTI-PAIR COMPARISON
@@ -586,82 +778,92 @@ with tab4:
 st.divider()
 st.subheader("📊 Multi-Pair Comparison")
 
-df_all_pairs = get_all_pairs_latest(selected_timeframe)
 
-if not df_all_pairs.empty:
-    df_all_pairs['pair'] = df_all_pairs['pair_y'] + '/' + df_all_pairs['pair_x']
-    
-    # Create comparison chart
-    fig_compare = go.Figure()
-    
-    fig_compare.add_trace(go.Bar(
-        x=df_all_pairs['pair'],
-        y=df_all_pairs['zscore'],
-        name='Z-Score',
-        marker_color=df_all_pairs['zscore'].apply(
-            lambda x: '#ef4444' if abs(x) > z_alert else '#22c55e'
-        ),
-        text=df_all_pairs['zscore'].round(2),
-        textposition='outside'
-    ))
-    
-    fig_compare.add_hline(y=z_alert, line_dash="dash", line_color="red", opacity=0.5)
-    fig_compare.add_hline(y=-z_alert, line_dash="dash", line_color="red", opacity=0.5)
-    
-    fig_compare.update_layout(
-        height=300,
-        template='plotly_dark',
-        xaxis_title="Symbol Pair",
-        yaxis_title="Z-Score",
-        showlegend=False
-    )
-    
-    st.plotly_chart(fig_compare, use_container_width=True)
-else:
-    st.info("No comparison data available yet for the selected timeframe.")
-    st.caption(f"Try switching to '1s' or wait for the analytics engine to produce {selected_timeframe} bars.")
+@st.fragment(run_every=COMPARISON_TTL if auto_refresh else None)
+def render_pair_comparison():
+    """Latest z-score of every configured pair"""
+    df_all_pairs = get_all_pairs_latest(selected_timeframe)
+
+    if not df_all_pairs.empty:
+        
+        # Create comparison chart
+        fig_compare = go.Figure()
+        
+        fig_compare.add_trace(go.Bar(
+            x=df_all_pairs['pair'],
+            y=df_all_pairs['zscore'],
+            name='Z-Score',
+            marker_color=np.where(df_all_pairs['zscore'].abs() > z_alert, '#ef4444', '#22c55e'),
+            text=df_all_pairs['zscore'].round(2),
+            textposition='outside'
+        ))
+        
+        fig_compare.add_hline(y=z_alert, line_dash="dash", line_color="red", opacity=0.5)
+        fig_compare.add_hline(y=-z_alert, line_dash="dash", line_color="red", opacity=0.5)
+        
+        fig_compare.update_layout(
+            height=300,
+            template='plotly_dark',
+            xaxis_title="Symbol Pair",
+            yaxis_title="Z-Score",
+            showlegend=False
+        )
+        
+        st.plotly_chart(fig_compare, use_container_width=True)
+    else:
+        st.info("No comparison data available yet for the selected timeframe.")
+        st.caption(f"Try switching to '1s' or wait for the analytics engine to produce {selected_timeframe} bars.")
+
+
+render_pair_comparison()
 
 # =====================================================
 # EXPORT SECTION
 # =====================================================
 st.sidebar.divider()
 
+export_ext, export_mime = EXPORT_TYPES[export_format]
+
 # Export analytics
-csv_analytics = df_analytics.to_csv(index=False).encode("utf-8")
 st.sidebar.download_button(
-    label="⬇️ Download Analytics CSV",
-    data=csv_analytics,
-    file_name=f"analytics_{pair_y}_{pair_x}_{selected_timeframe}.csv",
-    mime="text/csv"
+    label=f"⬇️ Download Analytics {export_format}",
+    data=encode_export(df_analytics, export_format),
+    file_name=f"analytics_{pair_y}_{pair_x}_{selected_timeframe}.{export_ext}",
+    mime=export_mime
 )
 
 # Export price data
-df_prices = load_price_data(pair_y, pair_x)
 if not df_prices.empty:
-    csv_prices = df_prices.to_csv(index=False).encode("utf-8")
     st.sidebar.download_button(
-        label="⬇️ Download Price Data CSV",
-        data=csv_prices,
-        file_name=f"prices_{pair_y}_{pair_x}.csv",
-        mime="text/csv"
+        label=f"⬇️ Download Price Data {export_format}",
+        data=encode_export(df_prices, export_format),
+        file_name=f"prices_{pair_y}_{pair_x}.{export_ext}",
+        mime=export_mime
     )
 
 # =====================================================
-# FOOTER & AUTO REFRESH
+# FOOTER
 # =====================================================
 st.divider()
-col1, col2, col3 = st.columns(3)
 
-with col1:
-    st.caption(f"Last Update: {latest['ts']}")
 
-with col2:
-    st.caption(f"Data Points: {len(df_analytics)}")
+@st.fragment(run_every=LIVE_RUN_EVERY)
+def render_footer():
+    """Freshness captions, refreshed with the live metrics above"""
+    df_analytics = load_analytics(pair_y, pair_x, selected_timeframe)
+    if df_analytics.empty:
+        return
+    
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.caption(f"Last Update: {df_analytics['ts'].iloc[-1]}")
+
+    with col2:
+        st.caption(f"Data Points: {len(df_analytics)}")
+
+    with col3:
+        st.caption(f"Timeframe: {selected_timeframe}")
 
-with col3:
-    st.caption(f"Timeframe: {selected_timeframe}")
 
-if auto_refresh:
-    import time
-    time.sleep(REFRESH_INTERVAL)
-    st.rerun()
\ No newline at end of file
+render_footer()
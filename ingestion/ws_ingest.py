@@ -1,10 +1,14 @@
 import asyncio
-import json
 import os
+import queue
+import signal
+import sqlite3
+import threading
+import time
 import yaml
 import aiosqlite
+import orjson
 import websockets
-from datetime import datetime
 import logging
 
 # Load configuration
@@ -27,35 +31,90 @@ BINANCE_WS = config['websocket']['url']
 PING_INTERVAL = config['websocket']['ping_interval']
 RECONNECT_DELAY = config['websocket']['reconnect_delay']
 
+# Ticks are buffered and handed to the writer thread one batch per flush
+# OR IGNORE makes trades replayed after a reconnect a no-op
+INSERT_SQL = """
+    INSERT OR IGNORE INTO ticks (ts, symbol, price, qty, is_buyer_maker, trade_id)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+FLUSH_ROWS = 500
+FLUSH_INTERVAL = 1.0  # seconds
+
 # Build stream string from config
 SYMBOLS = config['symbols']['pairs']
 streams = "/".join([f"{pair[0].lower()}@trade/{pair[1].lower()}@trade" for pair in SYMBOLS])
 
+# WAL persists in the database file; the rest are per-connection settings
+SQLITE_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-64000;
+    PRAGMA mmap_size=268435456;
+    PRAGMA busy_timeout=5000;
+"""
+
 
 async def create_db():
     """Initialize database schema"""
     async with aiosqlite.connect(DB_PATH) as db:
+        await db.executescript(SQLITE_PRAGMAS)
+        
+        # Older ticks tables (ISO text ts, rowid storage without trade ids)
+        # cannot take the current rows; move them aside instead of mixing
+        async with db.execute("PRAGMA table_info(ticks)") as cur:
+            columns = {row[1] for row in await cur.fetchall()}
+        if columns and "trade_id" not in columns:
+            legacy = f"ticks_legacy_{int(time.time())}"
+            await db.execute("DROP INDEX IF EXISTS idx_ticks_ts_symbol")
+            await db.execute(f"ALTER TABLE ticks RENAME TO {legacy}")
+            logger.warning(f"Renamed ticks table with the old schema to {legacy}")
+        
+        # Rows live in the primary key B-tree, clustered by (symbol, ts),
+        # which is how the engine and dashboard read them
         await db.execute("""
             CREATE TABLE IF NOT EXISTS ticks (
-                ts TEXT NOT NULL,
+                ts INTEGER NOT NULL,  -- trade time, epoch milliseconds
                 symbol TEXT NOT NULL,
                 price REAL NOT NULL,
                 qty REAL NOT NULL,
-                is_buyer_maker INTEGER
-            )
-        """)
-        
-        # Create index for faster queries
-        await db.execute("""
-            CREATE INDEX IF NOT EXISTS idx_ticks_ts_symbol 
-            ON ticks(ts, symbol)
+                is_buyer_maker INTEGER,
+                trade_id INTEGER NOT NULL,
+                PRIMARY KEY (symbol, ts, trade_id)
+            ) WITHOUT ROWID
         """)
         
         await db.commit()
         logger.info("Database schema initialized")
 
 
-async def ingest_once():
+def writer_loop(q):
+    """
+    Drain tick batches from q into SQLite until a None sentinel arrives
+    
+    Runs in its own thread with a plain sqlite3 connection, so each batch
+    is one executemany + commit without an aiosqlite round trip per call.
+    """
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn.executescript(SQLITE_PRAGMAS)
+    
+    try:
+        while True:
+            batch = q.get()
+            if batch is None:
+                break
+            
+            try:
+                with conn:
+                    conn.executemany(INSERT_SQL, batch)
+                logger.debug(f"Committed {len(batch)} ticks")
+            except sqlite3.Error as e:
+                logger.error(f"Failed to write {len(batch)} ticks: {e}")
+    finally:
+        conn.close()
+
+
+async def ingest_once(q):
     """Single WebSocket connection lifecycle"""
     uri = f"{BINANCE_WS}/{streams}"
     logger.info(f"Connecting to {uri}")
@@ -65,57 +124,83 @@ async def ingest_once():
         ping_interval=PING_INTERVAL,
         ping_timeout=PING_INTERVAL
     ) as ws:
-        async with aiosqlite.connect(DB_PATH) as db:
-            msg_count = 0
-            
+        msg_count = 0
+        buf = []
+        last_flush = time.monotonic()
+
+        try:
             while True:
                 msg = await ws.recv()
-                data = json.loads(msg)
+                data = orjson.loads(msg)
 
-                ts = datetime.utcfromtimestamp(data["T"] / 1000).isoformat()
+                ts = data["T"]
                 symbol = data["s"]
                 price = float(data["p"])
                 qty = float(data["q"])
                 is_buyer_maker = int(data["m"])
+                trade_id = data["t"]
 
-                await db.execute(
-                    "INSERT INTO ticks VALUES (?, ?, ?, ?, ?)",
-                    (ts, symbol, price, qty, is_buyer_maker)
-                )
-                
+                buf.append((ts, symbol, price, qty, is_buyer_maker, trade_id))
                 msg_count += 1
-                
-                # Commit in batches
-                if msg_count % 100 == 0:
-                    await db.commit()
-                    logger.debug(f"Committed {msg_count} ticks")
+
+                # Flush in batches, by size or age
+                if len(buf) >= FLUSH_ROWS or time.monotonic() - last_flush >= FLUSH_INTERVAL:
+                    q.put_nowait(buf)
+                    buf = []
+                    last_flush = time.monotonic()
 
                 if msg_count % 1000 == 0:
                     logger.info(f"Ingested {msg_count} ticks - Latest: {symbol} @ {price}")
+        finally:
+            # Keep whatever was buffered when the socket drops or the task is cancelled
+            if buf:
+                q.put_nowait(buf)
 
 
 async def ingest_forever():
     """Main ingestion loop with auto-reconnection"""
+    # SIGTERM (run_all, process managers) cancels this task like Ctrl+C
+    # does, so the finally below still drains the writer
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:
+        # Windows event loops have no signal handlers
+        pass
+    
     await create_db()
     
+    # Single writer thread for the whole process, surviving reconnects
+    q = queue.Queue()
+    writer = threading.Thread(target=writer_loop, args=(q,), daemon=True)
+    writer.start()
+    
     attempt = 0
-    while True:
-        try:
-            attempt += 1
-            logger.info(f"Ingestion attempt #{attempt}")
-            await ingest_once()
-
-        except websockets.ConnectionClosed as e:
-            logger.warning(f"WebSocket closed (code: {e.code}). Reconnecting in {RECONNECT_DELAY}s...")
-            await asyncio.sleep(RECONNECT_DELAY)
-
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}", exc_info=True)
-            await asyncio.sleep(RECONNECT_DELAY)
+    try:
+        while True:
+            try:
+                attempt += 1
+                logger.info(f"Ingestion attempt #{attempt}")
+                await ingest_once(q)
+
+            except websockets.ConnectionClosed as e:
+                logger.warning(f"WebSocket closed (code: {e.code}). Reconnecting in {RECONNECT_DELAY}s...")
+                await asyncio.sleep(RECONNECT_DELAY)
+
+            except Exception as e:
+                logger.error(f"Unexpected error: {e}", exc_info=True)
+                await asyncio.sleep(RECONNECT_DELAY)
+    finally:
+        # Let the writer drain queued batches before the process exits; a
+        # further Ctrl+C or run_all's follow-up SIGTERM must not cut it short
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        q.put(None)
+        writer.join()
 
 
 if __name__ == "__main__":
     try:
         asyncio.run(ingest_forever())
-    except KeyboardInterrupt:
-        logger.info("Ingestion stopped by user")
\ No newline at end of file
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        logger.info("Ingestion stopped")
\ No newline at end of file
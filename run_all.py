@@ -5,9 +5,11 @@ Usage:
     python run_all.py
 
 This script is cross-platform and writes stdout/stderr of each service to
-`logs/*.log`. Press Ctrl+C to stop all services.
+`logs/*.log`. Press Ctrl+C (or send SIGTERM) to stop all services; if any
+service exits on its own, the others are stopped too.
 """
 import os
+import signal
 import sys
 import time
 import subprocess
@@ -34,6 +36,30 @@ def start_process(name, cmd, logpath):
     return proc, logf
 
 
+def wait_for_exit(procs):
+    """Block until one of the services exits; return its name and exit code"""
+    if os.name == "posix":
+        # Sleep in the kernel until a child changes state
+        by_pid = {proc.pid: (name, proc) for name, proc, _ in procs}
+        while True:
+            pid, status = os.waitpid(-1, 0)
+            if pid in by_pid:
+                name, proc = by_pid[pid]
+                proc.returncode = os.waitstatus_to_exitcode(status)
+                return name, proc.returncode
+
+    # Windows has no wait-for-any-child call; poll instead
+    while True:
+        for name, proc, _ in procs:
+            if proc.poll() is not None:
+                return name, proc.returncode
+        time.sleep(1)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
 def main():
     ensure_dirs()
 
@@ -46,6 +72,9 @@ def main():
         ("dashboard", [python, "-m", "streamlit", "run", "dashboard/app.py"], os.path.join("logs", "dashboard.log")),
     ]
 
+    # Treat SIGTERM like Ctrl+C so services are shut down either way
+    signal.signal(signal.SIGTERM, _interrupt)
+
     procs = []
     try:
         for name, cmd, log in services:
@@ -54,8 +83,8 @@ def main():
             procs.append((name, proc, logf))
 
         print("\nAll services started. Press Ctrl+C to stop.")
-        while True:
-            time.sleep(1)
+        name, code = wait_for_exit(procs)
+        print(f"\n{name} exited with code {code}, stopping services...")
 
     except KeyboardInterrupt:
         print("\nStopping services...")
@@ -66,19 +95,15 @@ def main():
                 proc.terminate()
             except Exception:
                 pass
-        # give processes a moment to exit
-        time.sleep(1.5)
+        # give each process a few seconds to exit, then kill it
         for name, proc, logf in procs:
-            ret = None
             try:
-                ret = proc.poll()
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
             except Exception:
                 pass
-            if ret is None:
-                try:
-                    proc.kill()
-                except Exception:
-                    pass
             try:
                 logf.write(f"=== Stopped {name}\n")
                 logf.close()